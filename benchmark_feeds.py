@@ -0,0 +1,129 @@
+# benchmark_feeds.py - Compares feed parsing cost: feedparser vs. the streaming reader
+import io
+import sys
+import time
+import tracemalloc
+import requests
+import feedparser
+from datetime import datetime, timedelta, timezone
+from dateutil import parser
+from email.utils import format_datetime
+from feed_reader import HEADERS, CHUNK_SIZE, read_feed
+from main import SOURCES, TIME_WINDOW_DAYS, MAX_ARTICLES_PER_SOURCE
+
+# Run each parser several times on the same downloaded bytes so network time doesn't count.
+ROUNDS = 5
+# Size of the generated feed, roughly what an arXiv listing returns on a busy day.
+SAMPLE_FEED_ENTRIES = 500
+
+
+def build_sample_feed(entries=SAMPLE_FEED_ENTRIES):
+    """Builds an arXiv-style RSS 2.0 feed, newest first, one paper every 30 minutes."""
+    now = datetime.now(timezone.utc)
+    abstract = "We study scaling behaviour of transformer language models under a fixed compute budget. " * 15
+    items = []
+    for i in range(entries):
+        items.append(f"""
+    <item>
+      <title>Paper {i}: Efficient Attention at Scale</title>
+      <link>https://arxiv.org/abs/2610.{i:05d}</link>
+      <description>arXiv:2610.{i:05d}v1 Announce Type: new Abstract: {abstract}</description>
+      <guid isPermaLink="false">oai:arXiv.org:2610.{i:05d}v1</guid>
+      <category>cs.LG</category>
+      <pubDate>{format_datetime(now - timedelta(minutes=30 * i))}</pubDate>
+      <dc:creator>A. Author, B. Author</dc:creator>
+    </item>""")
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss xmlns:dc="http://purl.org/dc/elements/1.1/" version="2.0">
+  <channel>
+    <title>cs.LG updates on arXiv.org</title>
+    <link>http://rss.arxiv.org/rss/cs.LG</link>
+    <description>cs.LG updates on the arXiv.org e-print archive.</description>{"".join(items)}
+  </channel>
+</rss>""".encode()
+
+
+def feedparser_path(content, cut_off_date, max_articles):
+    """The original main.py loop: parse everything, sort, then dateutil-parse until the cutoff or limit."""
+    feed = feedparser.parse(content)
+    sorted_entries = sorted(
+        feed.entries,
+        key=lambda e: e.get('published_parsed', e.get('updated_parsed', (0,0,0,0,0,0))),
+        reverse=True
+    )
+    found = 0
+    for entry in sorted_entries:
+        if found >= max_articles:
+            break
+        published_date_str = entry.get('published', entry.get('updated'))
+        if not published_date_str: continue
+        try:
+            published_date_dt = parser.parse(published_date_str)
+            if published_date_dt.tzinfo is None:
+                published_date_dt = published_date_dt.replace(tzinfo=timezone.utc)
+        except (ValueError, TypeError):
+            continue
+        if published_date_dt < cut_off_date:
+            break
+        found += 1
+    return found
+
+
+def streaming_path(content, cut_off_date, max_articles):
+    """The feed_reader path, fed from memory in download-sized chunks."""
+    stream = io.BytesIO(content)
+    chunks = iter(lambda: stream.read(CHUNK_SIZE), b'')
+    found = 0
+    for entry in read_feed(chunks, cut_off_date):
+        if found >= max_articles:
+            break
+        found += 1
+    return found
+
+
+def measure(func, content, cut_off_date, max_articles):
+    """Returns (found, cpu seconds per run, peak bytes allocated) for one parser."""
+    start = time.process_time()
+    for _ in range(ROUNDS):
+        found = func(content, cut_off_date, max_articles)
+    cpu = (time.process_time() - start) / ROUNDS
+
+    tracemalloc.start()
+    func(content, cut_off_date, max_articles)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return found, cpu, peak
+
+
+def report(source_name, content, cut_off_date, max_articles=MAX_ARTICLES_PER_SOURCE):
+    """Prints one row comparing both parsers on the same bytes."""
+    fp_found, fp_cpu, fp_peak = measure(feedparser_path, content, cut_off_date, max_articles)
+    st_found, st_cpu, st_peak = measure(streaming_path, content, cut_off_date, max_articles)
+    note = '' if fp_found == st_found else f"  (found {fp_found} vs {st_found})"
+    print(
+        f"{source_name:<35} {len(content) / 1024:>6.0f} | "
+        f"{fp_cpu * 1000:>13.1f} {fp_peak / 1024:>8.0f} | "
+        f"{st_cpu * 1000:>12.1f} {st_peak / 1024:>8.0f}{note}"
+    )
+
+
+# Run with --offline to benchmark only the generated feed.
+if __name__ == '__main__':
+    cut_off_date = datetime.now(timezone.utc) - timedelta(days=TIME_WINDOW_DAYS)
+    print(f"{'Source':<35} {'KB':>6} | {'feedparser ms':>13} {'peak KB':>8} | {'streaming ms':>12} {'peak KB':>8}")
+    sample_feed = build_sample_feed()
+    report(f"Generated arXiv feed ({SAMPLE_FEED_ENTRIES} items)", sample_feed, cut_off_date)
+    # Worst case for streaming: no limit and nothing stale, so every entry is parsed.
+    report("  same feed, full scan", sample_feed, cut_off_date - timedelta(days=365), SAMPLE_FEED_ENTRIES)
+
+    if '--offline' in sys.argv:
+        sys.exit(0)
+
+    for source_name, rss_url in SOURCES.items():
+        try:
+            response = requests.get(rss_url, headers=HEADERS, timeout=15)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f"{source_name:<35} download failed: {e}")
+            continue
+        report(source_name, response.content, cut_off_date)
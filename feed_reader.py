@@ -0,0 +1,185 @@
+# feed_reader.py - Streaming RSS/Atom reader
+import requests
+import feedparser
+import xml.etree.ElementTree as ET
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from dateutil import parser
+
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36'}
+CHUNK_SIZE = 16 * 1024
+# Feeds are almost always newest-first; stop after this many stale entries in a row.
+STALE_ENTRY_LIMIT = 3
+# Feeds that turned out not to be newest-first; these are always read in full and sorted.
+UNORDERED_FEEDS = set()
+
+ENTRY_TAGS = ('item', 'entry')
+DATE_TAGS = ('pubDate', 'published', 'updated', 'date')
+
+
+def parse_feed_date(value):
+    """
+    Parses a feed date into a timezone-aware datetime, or returns None.
+    RFC 822 (RSS) and ISO 8601 (Atom) use the standard library; anything else falls back to dateutil.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        if value[:4].isdigit() and value[4:5] == '-':
+            dt = datetime.fromisoformat(value)
+        else:
+            dt = parsedate_to_datetime(value)
+    except (ValueError, TypeError, IndexError):
+        try:
+            dt = parser.parse(value)
+        except (ValueError, TypeError, OverflowError):
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _local_name(tag):
+    """Strips the XML namespace from a tag, e.g. '{http://www.w3.org/2005/Atom}entry' -> 'entry'."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _normalize_entry(elem):
+    """Turns an RSS <item> or Atom <entry> element into a plain dict."""
+    fields = {}
+    link = None
+    for child in elem:
+        name = _local_name(child.tag)
+        if name == 'link':
+            # RSS puts the URL in the text, Atom in the href of the 'alternate' link.
+            href = child.get('href')
+            if href is None:
+                link = link or (child.text or '').strip()
+            elif child.get('rel', 'alternate') == 'alternate':
+                link = href
+        elif name not in fields:
+            fields[name] = (child.text or '').strip()
+
+    published = next((fields[tag] for tag in DATE_TAGS if fields.get(tag)), None)
+    return {
+        'title': fields.get('title', ''),
+        'link': link or fields.get('guid') or fields.get('id'),
+        'published': published,
+        'published_dt': parse_feed_date(published),
+    }
+
+
+def iter_entries(chunks):
+    """Incrementally parses an iterable of byte chunks, yielding normalized entries as each one closes."""
+    pull_parser = ET.XMLPullParser(events=('end',))
+    for chunk in chunks:
+        pull_parser.feed(chunk)
+        for _, elem in pull_parser.read_events():
+            if _local_name(elem.tag) in ENTRY_TAGS:
+                yield _normalize_entry(elem)
+                elem.clear()
+    pull_parser.close()
+    for _, elem in pull_parser.read_events():
+        if _local_name(elem.tag) in ENTRY_TAGS:
+            yield _normalize_entry(elem)
+            elem.clear()
+
+
+def _iter_feedparser_entries(content):
+    """Fallback for feeds that aren't well-formed XML: feedparser is slower but forgiving."""
+    feed = feedparser.parse(content)
+    if feed.get('bozo') and not feed.entries:
+        raise RuntimeError(f"Could not parse RSS feed: {feed.get('bozo_exception')}")
+    sorted_entries = sorted(
+        feed.entries,
+        key=lambda e: e.get('published_parsed', e.get('updated_parsed', (0,0,0,0,0,0))),
+        reverse=True
+    )
+    for entry in sorted_entries:
+        published = entry.get('published', entry.get('updated'))
+        yield {
+            'title': entry.get('title', ''),
+            'link': entry.get('link'),
+            'published': published,
+            'published_dt': parse_feed_date(published),
+        }
+
+
+def _sorted_entries(content):
+    """Parses a whole feed and returns its entries newest first."""
+    try:
+        entries = list(iter_entries([content]))
+    except ET.ParseError as e:
+        print(f"Feed is not well-formed XML, falling back to feedparser. Error: {e}")
+        return list(_iter_feedparser_entries(content))
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    return sorted(entries, key=lambda e: e['published_dt'] or oldest, reverse=True)
+
+
+def read_feed(chunks, cut_off_date, feed_key=None):
+    """
+    Yields dated entries newer than cut_off_date from an iterable of byte chunks.
+    Chunks stop being pulled once the feed runs into old entries. The rest of the feed
+    is read and sorted instead if the XML turns out to be malformed, or if it starts
+    with old entries (which is how an oldest-first feed looks). Entries that were
+    already yielded are skipped. Feeds found to be out of order are remembered by
+    feed_key in UNORDERED_FEEDS and always sorted from then on.
+    """
+    received = []
+
+    def tracked_chunks():
+        for chunk in chunks:
+            received.append(chunk)
+            yield chunk
+
+    body = tracked_chunks()
+    yielded_links = set()
+    check_order = False
+
+    if feed_key not in UNORDERED_FEEDS:
+        stale_in_a_row = 0
+        try:
+            for entry in iter_entries(body):
+                if not entry['link'] or entry['published_dt'] is None:
+                    continue
+                if entry['published_dt'] < cut_off_date:
+                    stale_in_a_row += 1
+                    if stale_in_a_row < STALE_ENTRY_LIMIT:
+                        continue
+                    if yielded_links:
+                        return
+                    # Either nothing new was posted or the feed isn't newest-first; sorting tells which.
+                    check_order = True
+                    break
+                stale_in_a_row = 0
+                yielded_links.add(entry['link'])
+                yield entry
+            else:
+                return
+        except ET.ParseError:
+            pass
+
+    for _ in body:
+        pass
+    for entry in _sorted_entries(b''.join(received)):
+        if not entry['link'] or entry['published_dt'] is None or entry['link'] in yielded_links:
+            continue
+        if entry['published_dt'] < cut_off_date:
+            return
+        if check_order:
+            print(f"Feed isn't newest-first, reading it in full from now on: {feed_key or 'unnamed feed'}")
+            if feed_key:
+                UNORDERED_FEEDS.add(feed_key)
+            check_order = False
+        yield entry
+
+
+def stream_feed(rss_url, cut_off_date):
+    """
+    Yields dated entries newer than cut_off_date as the feed downloads.
+    The download stops as soon as the caller stops iterating or the feed runs into old entries.
+    """
+    with requests.get(rss_url, headers=HEADERS, timeout=15, stream=True) as response:
+        response.raise_for_status()
+        yield from read_feed(response.iter_content(CHUNK_SIZE), cut_off_date, feed_key=rss_url)
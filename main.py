@@ -1,14 +1,15 @@
 # main.py - FINAL PostgreSQL VERSION
 import os
+import sys
+import time
 import requests
-import feedparser
 import trafilatura
 import json5 as json
 import psycopg2
 import google.generativeai as genai # <-- THE MISSING IMPORT
 from dotenv import load_dotenv
 from datetime import datetime, timedelta, timezone
-from dateutil import parser
+from feed_reader import stream_feed
 
 # Load environment variables from .env file
 load_dotenv()
@@ -47,6 +48,18 @@ SOURCES = {
 TIME_WINDOW_DAYS = 3
 MAX_ARTICLES_PER_SOURCE = 5
 
+# Daemon mode (`python main.py --daemon`): each source is polled on its own interval,
+# learned from the publish dates already stored in `articles`. All values are in seconds.
+MIN_POLL_INTERVAL = 15 * 60
+DEFAULT_POLL_INTERVAL = 2 * 60 * 60
+MAX_POLL_INTERVAL = 24 * 60 * 60
+MAX_BACKOFF_INTERVAL = 12 * 60 * 60
+CADENCE_HISTORY_SIZE = 20
+MAX_ARTICLES_BURST = 15
+# Most articles a source may attempt (fetch + Gemini) per TIME_WINDOW_DAYS window,
+# about twice what a daily one-shot run spends on it.
+MAX_ARTICLES_PER_WINDOW = 2 * MAX_ARTICLES_PER_SOURCE * TIME_WINDOW_DAYS
+
 # --- DATABASE FUNCTIONS (PostgreSQL Version) ---
 
 def get_db_connection():
@@ -173,67 +186,218 @@ def analyze_with_gemini(text_to_analyze):
         return None
 
 
+# --- PER-SOURCE PROCESSING ---
+
+def process_source(cur, conn, source_name, rss_url, cut_off_date, max_articles, failed_urls=None):
+    """
+    Fetches one feed and analyzes up to max_articles new entries.
+    Returns (new_articles_count, attempts, backlog). Raises if the feed can't be fetched.
+
+    The scheduler passes failed_urls, a dict of url -> published date kept across polls.
+    In that mode URLs that failed before are skipped, failed attempts count toward
+    max_articles, and fresh unseen entries past the limit are counted as backlog.
+    """
+    print(f"\n{'='*20}\nProcessing source: {source_name}\n{'='*20}")
+    scheduled = failed_urls is not None
+    # One-shot runs keep spare candidates so failed articles can be replaced.
+    candidate_limit = max_articles if scheduled else MAX_ARTICLES_BURST
+    candidates = []
+    backlog = 0
+
+    # Read everything needed from the feed first: a server won't keep the response
+    # open while each article is downloaded and sent to Gemini.
+    entries = stream_feed(rss_url, cut_off_date)
+    try:
+        for entry in entries:
+            if scheduled and entry['link'] in failed_urls:
+                continue
+
+            cur.execute("SELECT id FROM articles WHERE url = %s", (entry['link'],))
+            if cur.fetchone():
+                continue
+
+            if len(candidates) < candidate_limit:
+                candidates.append(entry)
+                continue
+            if not scheduled:
+                break
+
+            backlog += 1
+            # The next quota is MAX_ARTICLES_PER_SOURCE + backlog, capped at the burst limit,
+            # so once that cap is reached there's no point reading further.
+            if MAX_ARTICLES_PER_SOURCE + backlog >= MAX_ARTICLES_BURST:
+                break
+    finally:
+        entries.close()
+
+    new_articles_count = 0
+    attempts = 0
+    for entry in candidates:
+        if new_articles_count >= max_articles:
+            print(f"Max article limit reached for {source_name}.")
+            break
+
+        attempts += 1
+        saved = False
+        print(f"Found new article: {entry['title']}")
+        main_text = fetch_and_extract_article(entry['link'])
+        if main_text:
+            analysis_json_str = analyze_with_gemini(main_text)
+            if analysis_json_str:
+                try:
+                    analysis_data = json.loads(analysis_json_str)
+                    save_analysis_to_db(cur, conn, entry['link'], entry['title'], entry['published_dt'], source_name, analysis_data)
+                    new_articles_count += 1
+                    saved = True
+                except ValueError as e:
+                    print(f"!!! JSON PARSING FAILED for article: {entry['title']}. Error: {e}")
+
+        if scheduled and not saved:
+            failed_urls[entry['link']] = entry['published_dt']
+
+    if backlog:
+        print(f"Max article limit reached for {source_name} ({backlog} left in backlog).")
+    return new_articles_count, attempts, backlog
+
+
+# --- ADAPTIVE SCHEDULER (DAEMON MODE) ---
+
+def median_publish_gap(dates):
+    """Returns the median gap in seconds between newest-first publish dates, or None with too little history."""
+    gaps = sorted(
+        (newer - older).total_seconds()
+        for newer, older in zip(dates, dates[1:])
+        if newer > older
+    )
+    if not gaps:
+        return None
+    return gaps[len(gaps) // 2]
+
+def learn_source_cadence(cur, source_name):
+    """Estimates how often a source publishes, in seconds, from its most recent articles."""
+    cur.execute('''
+        SELECT published_at FROM articles
+        WHERE source_name = %s AND published_at IS NOT NULL
+        ORDER BY published_at DESC
+        LIMIT %s
+    ''', (source_name, CADENCE_HISTORY_SIZE))
+    return median_publish_gap([row[0] for row in cur.fetchall()])
+
+def next_poll_interval(cadence, failures, backlog, budget_left):
+    """Picks the wait before the next poll of a source, in seconds."""
+    if failures:
+        return min(MIN_POLL_INTERVAL * 2 ** failures, MAX_BACKOFF_INTERVAL)
+    # Only hurry back for a backlog while the source still has budget to spend on it.
+    if backlog and budget_left > 0:
+        return MIN_POLL_INTERVAL
+    if cadence is None:
+        return DEFAULT_POLL_INTERVAL
+    # Poll about twice per expected publish so new items are picked up promptly.
+    return max(MIN_POLL_INTERVAL, min(cadence / 2, MAX_POLL_INTERVAL))
+
+def poll_due_sources(state, due):
+    """Polls one batch of due sources over a single database connection."""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cut_off_date = datetime.now(timezone.utc) - timedelta(days=TIME_WINDOW_DAYS)
+
+        for source_name in due:
+            source_state = state[source_name]
+            # Failed URLs are retried once they'd fall outside the window anyway.
+            source_state['failed_urls'] = {
+                url: published for url, published in source_state['failed_urls'].items()
+                if published >= cut_off_date
+            }
+            # Attempts made within the last window count against the source's budget.
+            window_start = time.time() - TIME_WINDOW_DAYS * 24 * 60 * 60
+            source_state['spent'] = [t for t in source_state['spent'] if t >= window_start]
+            budget_left = MAX_ARTICLES_PER_WINDOW - len(source_state['spent'])
+            # Let the quota grow with whatever was left over last time.
+            max_articles = min(
+                MAX_ARTICLES_PER_SOURCE + source_state['backlog'],
+                MAX_ARTICLES_BURST,
+                budget_left
+            )
+
+            if max_articles <= 0:
+                print(f"{source_name} has used its budget of {MAX_ARTICLES_PER_WINDOW} articles per {TIME_WINDOW_DAYS} days, skipping.")
+            else:
+                try:
+                    _, attempts, backlog = process_source(
+                        cur, conn, source_name, SOURCES[source_name], cut_off_date, max_articles,
+                        failed_urls=source_state['failed_urls']
+                    )
+                    source_state['failures'] = 0
+                    source_state['backlog'] = backlog
+                    source_state['spent'].extend([time.time()] * attempts)
+                    budget_left -= attempts
+                except Exception as e:
+                    conn.rollback()
+                    source_state['failures'] += 1
+                    print(f"Could not process {source_name} (failure #{source_state['failures']}). Error: {e}")
+
+            cadence = learn_source_cadence(cur, source_name)
+            interval = next_poll_interval(cadence, source_state['failures'], source_state['backlog'], budget_left)
+            source_state['next_poll'] = time.time() + interval
+            print(f"Next poll of {source_name} in {interval / 60:.0f} minutes.")
+    finally:
+        cur.close()
+        conn.close()
+
+def run_scheduler():
+    """Polls every source forever, each on its own adaptive interval."""
+    state = {
+        source_name: {'next_poll': 0.0, 'failures': 0, 'backlog': 0, 'failed_urls': {}, 'spent': []}
+        for source_name in SOURCES
+    }
+
+    while True:
+        now = time.time()
+        due = [name for name, s in state.items() if s['next_poll'] <= now]
+
+        if due:
+            try:
+                poll_due_sources(state, due)
+            except Exception as e:
+                # Usually the database went away; keep the daemon alive and try again shortly.
+                print(f"Scheduler batch failed, retrying in {MIN_POLL_INTERVAL / 60:.0f} minutes. Error: {e}")
+                retry_at = time.time() + MIN_POLL_INTERVAL
+                for source_name in due:
+                    if state[source_name]['next_poll'] <= now:
+                        state[source_name]['next_poll'] = retry_at
+
+        sleep_for = min(s['next_poll'] for s in state.values()) - time.time()
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+
+
 # --- MAIN EXECUTION BLOCK ---
 
 if __name__ == '__main__':
     setup_database()
+
+    if '--daemon' in sys.argv:
+        print("Starting adaptive polling scheduler. Press Ctrl+C to stop.")
+        try:
+            run_scheduler()
+        except KeyboardInterrupt:
+            print("\nScheduler stopped.")
+        sys.exit(0)
+
     cut_off_date = datetime.now(timezone.utc) - timedelta(days=TIME_WINDOW_DAYS)
 
     conn = get_db_connection()
     cur = conn.cursor()
 
     for source_name, rss_url in SOURCES.items():
-        print(f"\n{'='*20}\nProcessing source: {source_name}\n{'='*20}")
-        new_articles_count = 0
         try:
-            feed = feedparser.parse(rss_url)
-            if not feed.entries:
-                print(f"No entries found for {source_name}.")
-                continue
+            process_source(cur, conn, source_name, rss_url, cut_off_date, MAX_ARTICLES_PER_SOURCE)
         except Exception as e:
-            print(f"Could not parse RSS feed. Error: {e}")
+            conn.rollback()
+            print(f"Could not process {source_name}. Error: {e}")
             continue
 
-        sorted_entries = sorted(
-            feed.entries, 
-            key=lambda e: e.get('published_parsed', e.get('updated_parsed', (0,0,0,0,0,0))), 
-            reverse=True
-        )
-
-        for entry in sorted_entries:
-            if new_articles_count >= MAX_ARTICLES_PER_SOURCE:
-                print(f"Max article limit reached for {source_name}.")
-                break
-            
-            published_date_str = entry.get('published', entry.get('updated'))
-            if not published_date_str: continue
-
-            try:
-                published_date_dt = parser.parse(published_date_str)
-                if published_date_dt.tzinfo is None:
-                    published_date_dt = published_date_dt.replace(tzinfo=timezone.utc)
-            except (ValueError, TypeError):
-                continue
-            
-            if published_date_dt < cut_off_date:
-                break
-
-            cur.execute("SELECT id FROM articles WHERE url = %s", (entry.link,))
-            if cur.fetchone():
-                continue
-            
-            print(f"Found new article: {entry.title}")
-            main_text = fetch_and_extract_article(entry.link)
-            if main_text:
-                analysis_json_str = analyze_with_gemini(main_text)
-                if analysis_json_str:
-                    try:
-                        analysis_data = json.loads(analysis_json_str)
-                        save_analysis_to_db(cur, conn, entry.link, entry.title, published_date_str, source_name, analysis_data)
-                        new_articles_count += 1
-                    except ValueError as e:
-                        print(f"!!! JSON PARSING FAILED for article: {entry.title}. Error: {e}")
-
     cur.close()
     conn.close()
     print("\nAll sources processed.")
\ No newline at end of file
@@ -0,0 +1,169 @@
+# test_feed_reader.py - Checks for the streaming feed reader
+from datetime import datetime, timedelta, timezone
+
+from feed_reader import UNORDERED_FEEDS, iter_entries, parse_feed_date, read_feed
+
+UTC = timezone.utc
+CUT_OFF = datetime(2026, 10, 16, tzinfo=UTC)
+
+ATOM_FEED = b'''<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Example Blog</title>
+  <link href="https://blog.example.org/"/>
+  <entry>
+    <title>Announcing Model X</title>
+    <link rel="self" href="https://blog.example.org/feed/model-x"/>
+    <link rel="alternate" href="https://blog.example.org/model-x"/>
+    <id>tag:blog.example.org,2026:model-x</id>
+    <published>2026-10-18T09:30:00Z</published>
+    <updated>2026-10-19T08:00:00Z</updated>
+  </entry>
+  <entry>
+    <title>No alternate link</title>
+    <id>https://blog.example.org/no-link</id>
+    <updated>2026-10-17T10:00:00.5+02:00</updated>
+  </entry>
+</feed>'''
+
+RSS1_FEED = b'''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns="http://purl.org/rss/1.0/"
+         xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <channel rdf:about="https://export.example.org/rss/cs.AI">
+    <title>cs.AI updates</title>
+    <link>https://export.example.org/</link>
+  </channel>
+  <item rdf:about="https://arxiv.org/abs/2610.00001">
+    <title>Paper One</title>
+    <link>https://arxiv.org/abs/2610.00001</link>
+    <dc:date>2026-10-19</dc:date>
+  </item>
+</rdf:RDF>'''
+
+
+def rss_feed(items):
+    """Builds an RSS 2.0 feed from (title, link, pubDate, description) tuples."""
+    body = "".join(
+        f"<item><title>{title}</title><link>{link}</link><pubDate>{date}</pubDate>"
+        f"<description>{description}</description></item>"
+        for title, link, date, description in items
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed</title>{body}</channel></rss>'.encode()
+
+
+def chunked(content, size):
+    return [content[i:i + size] for i in range(0, len(content), size)]
+
+
+def test_parse_rfc822_dates():
+    assert parse_feed_date("Mon, 19 Oct 2026 10:00:00 GMT") == datetime(2026, 10, 19, 10, tzinfo=UTC)
+    assert parse_feed_date("19 Oct 2026 12:00:00 +0200") == datetime(2026, 10, 19, 10, tzinfo=UTC)
+
+
+def test_parse_iso_dates():
+    assert parse_feed_date("2026-10-19T10:00:00Z") == datetime(2026, 10, 19, 10, tzinfo=UTC)
+    assert parse_feed_date(" 2026-10-19T12:00:00+02:00 ") == datetime(2026, 10, 19, 10, tzinfo=UTC)
+    # Naive dates are taken as UTC.
+    assert parse_feed_date("2026-10-19") == datetime(2026, 10, 19, tzinfo=UTC)
+
+
+def test_parse_other_dates_fall_back_to_dateutil():
+    assert parse_feed_date("October 19, 2026 10:00 UTC") == datetime(2026, 10, 19, 10, tzinfo=UTC)
+
+
+def test_parse_bad_dates():
+    assert parse_feed_date(None) is None
+    assert parse_feed_date("") is None
+    assert parse_feed_date("not a date") is None
+
+
+def test_atom_feed_uses_alternate_link():
+    entries = list(iter_entries([ATOM_FEED]))
+    assert [e['title'] for e in entries] == ["Announcing Model X", "No alternate link"]
+    assert entries[0]['link'] == "https://blog.example.org/model-x"
+    assert entries[0]['published_dt'] == datetime(2026, 10, 18, 9, 30, tzinfo=UTC)
+    # Without any link element the id is used.
+    assert entries[1]['link'] == "https://blog.example.org/no-link"
+    assert entries[1]['published_dt'] == datetime(2026, 10, 17, 8, 0, 0, 500000, tzinfo=UTC)
+
+
+def test_rss1_feed_uses_dc_date():
+    entries = list(iter_entries([RSS1_FEED]))
+    assert len(entries) == 1
+    assert entries[0]['link'] == "https://arxiv.org/abs/2610.00001"
+    assert entries[0]['published_dt'] == datetime(2026, 10, 19, tzinfo=UTC)
+
+
+def test_chunk_boundaries_do_not_matter():
+    whole = list(iter_entries([ATOM_FEED]))
+    for size in (1, 7, 64):
+        assert list(iter_entries(chunked(ATOM_FEED, size))) == whole
+
+
+def test_read_feed_stops_pulling_chunks_after_stale_entries():
+    now = datetime(2026, 10, 19, tzinfo=UTC)
+    feed = rss_feed(
+        (f"Item {i}", f"https://example.org/{i}", (now - timedelta(days=i)).strftime('%a, %d %b %Y %H:%M:%S +0000'), "x" * 200)
+        for i in range(50)
+    )
+    chunks = chunked(feed, 256)
+    pulled = []
+
+    def source():
+        for chunk in chunks:
+            pulled.append(chunk)
+            yield chunk
+
+    entries = list(read_feed(source(), CUT_OFF))
+    assert [e['link'] for e in entries] == [f"https://example.org/{i}" for i in range(4)]
+    assert len(pulled) < len(chunks)
+
+
+def test_malformed_feed_falls_back_without_duplicates():
+    # &nbsp; isn't defined in XML, so the strict parser fails on the second item.
+    feed = rss_feed([
+        ("A", "https://example.org/a", "Mon, 19 Oct 2026 10:00:00 GMT", "fine"),
+        ("B", "https://example.org/b", "Sun, 18 Oct 2026 10:00:00 GMT", "breaks&nbsp;here"),
+        ("C", "https://example.org/c", "Sat, 17 Oct 2026 10:00:00 GMT", "fine"),
+        ("D", "https://example.org/d", "Mon, 12 Oct 2026 10:00:00 GMT", "too old"),
+    ])
+    entries = list(read_feed(chunked(feed, 32), CUT_OFF))
+    assert [e['link'] for e in entries] == [
+        "https://example.org/a", "https://example.org/b", "https://example.org/c",
+    ]
+
+
+def dated_items(days_ago):
+    now = datetime(2026, 10, 19, tzinfo=UTC)
+    return [
+        (f"Item {d}", f"https://example.org/{d}", (now - timedelta(days=d)).strftime('%a, %d %b %Y %H:%M:%S +0000'), "")
+        for d in days_ago
+    ]
+
+
+def test_oldest_first_feed_is_sorted_and_remembered():
+    feed = rss_feed(dated_items([9, 8, 7, 6, 5, 2, 1, 0]))
+    key = "https://example.org/oldest-first.xml"
+    entries = list(read_feed(chunked(feed, 64), CUT_OFF, feed_key=key))
+    assert [e['link'] for e in entries] == [f"https://example.org/{d}" for d in (0, 1, 2)]
+    assert key in UNORDERED_FEEDS
+
+    # Later reads go straight to the sorted path, even when the top of the feed looks fine.
+    feed = rss_feed(dated_items([1, 9, 8, 7, 0]))
+    entries = list(read_feed(chunked(feed, 64), CUT_OFF, feed_key=key))
+    assert [e['link'] for e in entries] == ["https://example.org/0", "https://example.org/1"]
+
+
+def test_pinned_old_entries_do_not_hide_new_ones():
+    feed = rss_feed(dated_items([400, 300, 200, 1, 2, 10]))
+    key = "https://example.org/pinned.xml"
+    entries = list(read_feed(chunked(feed, 64), CUT_OFF, feed_key=key))
+    assert [e['link'] for e in entries] == ["https://example.org/1", "https://example.org/2"]
+    assert key in UNORDERED_FEEDS
+
+
+def test_quiet_feed_is_not_marked_unordered():
+    feed = rss_feed(dated_items([5, 6, 7, 8, 9]))
+    key = "https://example.org/quiet.xml"
+    assert list(read_feed(chunked(feed, 64), CUT_OFF, feed_key=key)) == []
+    assert key not in UNORDERED_FEEDS
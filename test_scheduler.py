@@ -0,0 +1,246 @@
+# test_scheduler.py - Checks for the adaptive polling scheduler in main.py
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import main
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeCursor:
+    """Stands in for a psycopg2 cursor: no URL is in the database yet and there's no history."""
+    def execute(self, query, params=None):
+        pass
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class FakeConn:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor()
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+
+def fake_entries(count):
+    return [
+        {'title': f"Paper {i}", 'link': f"https://example.org/{i}", 'published': None,
+         'published_dt': NOW - timedelta(minutes=i)}
+        for i in range(count)
+    ]
+
+
+def run_process_source(monkeypatch, entries, max_articles, failed_urls=None, analysis='{"executive_summary": "ok"}'):
+    """Runs process_source on fixed entries with downloads, Gemini and the DB write stubbed out."""
+    attempted = []
+    monkeypatch.setattr(main, 'stream_feed', lambda url, cut_off: (entry for entry in entries))
+    monkeypatch.setattr(main, 'fetch_and_extract_article', lambda url: attempted.append(url) or "text")
+    monkeypatch.setattr(main, 'analyze_with_gemini', lambda text: analysis)
+    monkeypatch.setattr(main, 'save_analysis_to_db', lambda *args: None)
+    result = main.process_source(
+        FakeCursor(), FakeConn(), "Test", "https://example.org/feed", NOW - timedelta(days=3),
+        max_articles, failed_urls=failed_urls
+    )
+    return result, attempted
+
+
+def test_median_publish_gap():
+    dates = [NOW, NOW - timedelta(hours=1), NOW - timedelta(hours=3), NOW - timedelta(hours=9)]
+    assert main.median_publish_gap(dates) == 2 * 60 * 60
+
+
+def test_median_publish_gap_needs_history():
+    assert main.median_publish_gap([]) is None
+    assert main.median_publish_gap([NOW]) is None
+    # Identical timestamps (e.g. an arXiv batch) say nothing about cadence.
+    assert main.median_publish_gap([NOW, NOW]) is None
+
+
+def test_next_poll_interval_follows_cadence():
+    assert main.next_poll_interval(4 * 60 * 60, 0, 0, 10) == 2 * 60 * 60
+    assert main.next_poll_interval(60, 0, 0, 10) == main.MIN_POLL_INTERVAL
+    assert main.next_poll_interval(30 * 24 * 60 * 60, 0, 0, 10) == main.MAX_POLL_INTERVAL
+    assert main.next_poll_interval(None, 0, 0, 10) == main.DEFAULT_POLL_INTERVAL
+
+
+def test_next_poll_interval_backlog_polls_soon():
+    assert main.next_poll_interval(24 * 60 * 60, 0, 3, 10) == main.MIN_POLL_INTERVAL
+
+
+def test_next_poll_interval_backlog_waits_once_budget_is_spent():
+    assert main.next_poll_interval(4 * 60 * 60, 0, 3, 0) == 2 * 60 * 60
+    assert main.next_poll_interval(None, 0, 3, 0) == main.DEFAULT_POLL_INTERVAL
+
+
+def test_next_poll_interval_backs_off_and_caps():
+    assert main.next_poll_interval(None, 1, 0, 10) == 2 * main.MIN_POLL_INTERVAL
+    assert main.next_poll_interval(None, 2, 0, 10) == 4 * main.MIN_POLL_INTERVAL
+    assert main.next_poll_interval(None, 20, 5, 10) == main.MAX_BACKOFF_INTERVAL
+
+
+def test_one_shot_stops_at_limit(monkeypatch):
+    (new_count, attempts, backlog), attempted = run_process_source(monkeypatch, fake_entries(50), 5)
+    assert (new_count, attempts, backlog) == (5, 5, 0)
+    assert len(attempted) == 5
+
+
+def test_scheduled_failures_count_toward_quota_and_are_remembered(monkeypatch):
+    failed_urls = {}
+    entries = fake_entries(3)
+    (new_count, attempts, backlog), attempted = run_process_source(
+        monkeypatch, entries, 2, failed_urls=failed_urls, analysis="not json {"
+    )
+    assert (new_count, attempts) == (0, 2)
+    assert len(attempted) == 2
+    assert backlog == 1
+    assert set(failed_urls) == {entries[0]['link'], entries[1]['link']}
+
+    # The next poll skips the known failures and only tries the remaining entry.
+    _, attempted = run_process_source(monkeypatch, entries, 2, failed_urls=failed_urls, analysis="not json {")
+    assert attempted == [entries[2]['link']]
+
+
+def test_backlog_keeps_burst_quota(monkeypatch):
+    quota = main.MAX_ARTICLES_PER_SOURCE
+    quotas = []
+    for _ in range(4):
+        (_, _, backlog), _ = run_process_source(monkeypatch, fake_entries(200), quota, failed_urls={})
+        quotas.append(quota)
+        quota = min(main.MAX_ARTICLES_PER_SOURCE + backlog, main.MAX_ARTICLES_BURST)
+    assert quotas == [5, 15, 15, 15]
+
+
+class KnownUrlsCursor(FakeCursor):
+    """A cursor where the given URLs are already in the database."""
+    def __init__(self, known_urls):
+        self.known_urls = known_urls
+        self.last_url = None
+
+    def execute(self, query, params=None):
+        self.last_url = params[0]
+
+    def fetchone(self):
+        return (1,) if self.last_url in self.known_urls else None
+
+
+class SlowClientFeedHandler(BaseHTTPRequestHandler):
+    """Serves a large feed but gives up on clients that stop reading, like a real server's send timeout."""
+    timeout = 0.5
+    feed = b''
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 16 * 1024)
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Length', str(len(self.feed)))
+        self.end_headers()
+        try:
+            # Write in pieces so the timeout applies to each stalled write, not the whole body.
+            for start in range(0, len(self.feed), 64 * 1024):
+                self.wfile.write(self.feed[start:start + 64 * 1024])
+        except OSError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+def test_feed_is_read_before_articles_are_processed(monkeypatch):
+    now = datetime.now(timezone.utc)
+    count = 10000
+    description = "x" * 2000
+    items = "".join(
+        f"<item><title>Paper {i}</title><link>https://example.org/{i}</link>"
+        f"<pubDate>{format_datetime(now - timedelta(seconds=i))}</pubDate>"
+        f"<description>{description}</description></item>"
+        for i in range(count)
+    )
+    SlowClientFeedHandler.feed = f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>'.encode()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowClientFeedHandler)
+    server.handle_error = lambda *args: None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def slow_fetch(url):
+        # Longer than the server's send timeout, as downloading and analyzing an article would be.
+        time.sleep(1)
+        return "text"
+
+    monkeypatch.setattr(main, 'fetch_and_extract_article', slow_fetch)
+    monkeypatch.setattr(main, 'analyze_with_gemini', lambda text: '{"executive_summary": "ok"}')
+    monkeypatch.setattr(main, 'save_analysis_to_db', lambda *args: None)
+    # Only the first and last entries are new, so the whole feed has to be read.
+    known_urls = {f"https://example.org/{i}" for i in range(1, count - 1)}
+    try:
+        new_count, _, backlog = main.process_source(
+            KnownUrlsCursor(known_urls), FakeConn(), "Test", f"http://127.0.0.1:{server.server_port}/feed",
+            now - timedelta(days=3), 2
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert (new_count, backlog) == (2, 0)
+
+
+def test_source_with_permanent_backlog_stays_within_budget(monkeypatch):
+    clock = [1_000_000.0]
+    spent = []
+
+    def busy_source(cur, conn, source_name, rss_url, cut_off_date, max_articles, failed_urls=None):
+        # Like an arXiv listing: every poll uses the whole quota and leaves a large backlog.
+        spent.append((clock[0], max_articles))
+        return max_articles, max_articles, 100
+
+    monkeypatch.setattr(main.time, 'time', lambda: clock[0])
+    monkeypatch.setattr(main, 'get_db_connection', FakeConn)
+    monkeypatch.setattr(main, 'process_source', busy_source)
+    state = {"arXiv: AI": {'next_poll': 0.0, 'failures': 0, 'backlog': 0, 'failed_urls': {}, 'spent': []}}
+
+    window = main.TIME_WINDOW_DAYS * 24 * 60 * 60
+    end = clock[0] + 4 * window
+    while clock[0] < end:
+        main.poll_due_sources(state, ["arXiv: AI"])
+        clock[0] = state["arXiv: AI"]['next_poll']
+
+    for poll_time, _ in spent:
+        in_window = sum(n for t, n in spent if poll_time - window < t <= poll_time)
+        assert in_window <= main.MAX_ARTICLES_PER_WINDOW
+    assert sum(n for _, n in spent) <= 4 * main.MAX_ARTICLES_PER_WINDOW
+
+
+def test_scheduler_survives_database_outage(monkeypatch):
+    def refuse_connection():
+        raise main.psycopg2.OperationalError("connection refused")
+
+    class StopScheduler(Exception):
+        pass
+
+    def stop(seconds):
+        raise StopScheduler
+
+    monkeypatch.setattr(main, 'get_db_connection', refuse_connection)
+    monkeypatch.setattr(main.time, 'sleep', stop)
+    with pytest.raises(StopScheduler):
+        main.run_scheduler()